@@ -3,27 +3,35 @@
 Data source: https://github.com/TheEconomist/big-mac-data
 """
 
-import csv
-from io import StringIO
 import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from subsets_utils import get, save_raw_file, load_raw_file, upload_data, validate
 from subsets_utils.testing import assert_valid_date, assert_positive
 
 BIG_MAC_URL = "https://raw.githubusercontent.com/TheEconomist/big-mac-data/master/output-data/big-mac-full-index.csv"
 DATASET_ID = "big_mac_index"
 
+# Source column -> output column
+COLUMN_MAP = {
+    "date": "date",
+    "name": "country",
+    "iso_a3": "iso_a3",
+    "currency_code": "currency_code",
+    "local_price": "local_price",
+    "dollar_ex": "dollar_ex",
+    "dollar_price": "dollar_price",
+    "USD_raw": "usd_raw",
+    "EUR_raw": "eur_raw",
+    "GBP_raw": "gbp_raw",
+    "JPY_raw": "jpy_raw",
+    "CNY_raw": "cny_raw",
+    "GDP_bigmac": "gdp_per_capita",
+    "USD_adjusted": "usd_adjusted",
+}
 
-def parse_float(value: str) -> float | None:
-    """Parse float value, returning None for empty/invalid."""
-    if not value:
-        return None
-    value = value.strip()
-    if not value:
-        return None
-    try:
-        return float(value)
-    except ValueError:
-        return None
+STRING_COLUMNS = ["date", "name", "iso_a3", "currency_code"]
+FLOAT_COLUMNS = [col for col in COLUMN_MAP if col not in STRING_COLUMNS]
 
 
 def test(table: pa.Table) -> None:
@@ -43,21 +51,21 @@ def test(table: pa.Table) -> None:
     assert_valid_date(table, "date")
     assert_positive(table, "dollar_price")
 
-    countries = set(table.column("country").to_pylist())
-    assert len(countries) >= 20, f"Expected at least 20 countries, got {len(countries)}"
+    num_countries = len(pc.unique(table.column("country")))
+    assert num_countries >= 20, f"Expected at least 20 countries, got {num_countries}"
 
-    dates = table.column("date").to_pylist()
-    min_date = min(dates)
-    max_date = max(dates)
+    date_range = pc.min_max(table.column("date"))
+    min_date = date_range["min"].as_py()
+    max_date = date_range["max"].as_py()
 
     assert min_date < "2005-01-01", f"Expected historical data, got earliest: {min_date}"
     assert max_date > "2020-01-01", f"Expected recent data, got latest: {max_date}"
 
-    prices = [p for p in table.column("dollar_price").to_pylist() if p is not None]
-    assert max(prices) < 20, f"Suspicious high price: ${max(prices)}"
-    assert min(prices) > 0.5, f"Suspicious low price: ${min(prices)}"
+    price_range = pc.min_max(table.column("dollar_price"))
+    assert price_range["max"].as_py() < 20, f"Suspicious high price: ${price_range['max'].as_py()}"
+    assert price_range["min"].as_py() > 0.5, f"Suspicious low price: ${price_range['min'].as_py()}"
 
-    print(f"  Validated {len(table):,} Big Mac records across {len(countries)} countries")
+    print(f"  Validated {len(table):,} Big Mac records across {num_countries} countries")
 
 
 def run():
@@ -66,55 +74,43 @@ def run():
     print("Fetching Big Mac Index...")
     response = get(BIG_MAC_URL, timeout=60)
     response.raise_for_status()
-    save_raw_file(response.text, "big_mac_index", extension="csv")
-    print(f"  Saved big_mac_index.csv ({len(response.text):,} bytes)")
+    save_raw_file(response.content, "big_mac_index", extension="csv")
+    print(f"  Saved big_mac_index.csv ({len(response.content):,} bytes)")
 
     # Transform
     print("Transforming Big Mac Index data...")
-    csv_text = load_raw_file("big_mac_index", extension="csv")
-
-    records = []
-    reader = csv.DictReader(StringIO(csv_text))
-
-    for row in reader:
-        date = row.get("date", "").strip()
-        if not date:
-            continue
-
-        dollar_price = parse_float(row.get("dollar_price"))
-        if dollar_price is None:
-            continue
-
-        record = {
-            "date": date,
-            "country": row.get("name", "").strip(),
-            "iso_a3": row.get("iso_a3", "").strip(),
-            "currency_code": row.get("currency_code", "").strip(),
-            "local_price": parse_float(row.get("local_price")),
-            "dollar_ex": parse_float(row.get("dollar_ex")),
-            "dollar_price": dollar_price,
-            "usd_raw": parse_float(row.get("USD_raw")),
-            "eur_raw": parse_float(row.get("EUR_raw")),
-            "gbp_raw": parse_float(row.get("GBP_raw")),
-            "jpy_raw": parse_float(row.get("JPY_raw")),
-            "cny_raw": parse_float(row.get("CNY_raw")),
-            "gdp_per_capita": parse_float(row.get("GDP_bigmac")),
-            "usd_adjusted": parse_float(row.get("USD_adjusted")),
-        }
-        records.append(record)
-
-    if not records:
+    csv_data = load_raw_file("big_mac_index", extension="csv", binary=True)
+
+    raw = pacsv.read_csv(
+        pa.BufferReader(csv_data),
+        convert_options=pacsv.ConvertOptions(
+            column_types={
+                **{col: pa.string() for col in STRING_COLUMNS},
+                **{col: pa.float64() for col in FLOAT_COLUMNS},
+            },
+            null_values=["", "NA"],
+            strings_can_be_null=True,
+        ),
+    )
+
+    columns = {}
+    for source, target in COLUMN_MAP.items():
+        if source in raw.column_names:
+            columns[target] = raw.column(source)
+        else:
+            columns[target] = pa.nulls(len(raw), pa.float64())
+    table = pa.table(columns)
+
+    table = table.filter(pc.and_(pc.is_valid(table["date"]), pc.is_valid(table["dollar_price"])))
+    if len(table) == 0:
         raise ValueError("No Big Mac Index data found")
 
-    records.sort(key=lambda r: (r["date"], r["country"]))
-
-    table = pa.Table.from_pylist(records)
-
-    countries = set(r["country"] for r in records)
-    dates = [r["date"] for r in records]
+    table = table.sort_by([("date", "ascending"), ("country", "ascending")])
 
-    print(f"  Transformed {len(records):,} records")
-    print(f"  {len(countries)} countries, {min(dates)} to {max(dates)}")
+    date_range = pc.min_max(table.column("date"))
+    print(f"  Transformed {len(table):,} records")
+    print(f"  {len(pc.unique(table.column('country')))} countries, "
+          f"{date_range['min'].as_py()} to {date_range['max'].as_py()}")
 
     test(table)
     upload_data(table, DATASET_ID, mode="overwrite")
@@ -3,16 +3,24 @@
 Data source: https://rigcount.bakerhughes.com/
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 import httpx
 import pyarrow as pa
+import pyarrow.compute as pc
 import pandas as pd
-from subsets_utils import get, save_raw_file, get_data_dir, upload_data, validate
+from subsets_utils import get_client, load_state, save_state, save_raw_file_stream, get_data_dir, upload_data, validate
 from subsets_utils.testing import assert_valid_date, assert_positive
 
 DATASET_ID = "baker_hughes_rig_count_weekly"
 
+# Concurrent download limit for the Baker Hughes static-file host
+MAX_DOWNLOAD_WORKERS = 8
+
+# Chunk size for streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 65536
+
 FILES = {
     "na_current": "https://rigcount.bakerhughes.com/static-files/73462640-906f-4bd5-b691-6a1ffe5c59ed",
     "na_2013_present": "https://rigcount.bakerhughes.com/static-files/e98bcf83-c458-4a88-8f35-4ac4d77628bb",
@@ -46,11 +54,30 @@ def is_transient_error(exception):
     retry=retry_if_exception(is_transient_error),
     reraise=True
 )
-def fetch_file(url: str, timeout: int = 300):
-    """Fetch a file with retry logic for transient errors."""
-    response = get(url, timeout=timeout)
-    response.raise_for_status()
-    return response
+def fetch_file(url: str, name: str, timeout: int = 300, cached: dict | None = None) -> tuple[int, dict] | None:
+    """Stream a file to the raw store with retry logic for transient errors.
+
+    Sends a conditional request when cached validators are supplied.
+    Returns (bytes downloaded, response validators), or None when the
+    server reports the previously saved copy is still current (304).
+    """
+    headers = {}
+    cached = cached or {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    client = get_client()
+    with client.stream("GET", url, timeout=timeout, headers=headers) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        save_raw_file_stream(response.iter_bytes(DOWNLOAD_CHUNK_SIZE), name, extension="xlsx")
+        return response.num_bytes_downloaded, {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
 
 
 def test(table: pa.Table) -> None:
@@ -69,43 +96,36 @@ def test(table: pa.Table) -> None:
     assert_valid_date(table, "date")
     assert_positive(table, "count", allow_zero=True)
 
-    regions = set(table.column("region").to_pylist())
-    assert len(regions) >= 5, f"Expected multiple regions, got {len(regions)}"
+    num_regions = len(pc.unique(table.column("region")))
+    assert num_regions >= 5, f"Expected multiple regions, got {num_regions}"
 
-    dates = table.column("date").to_pylist()
-    max_date = max(dates)
+    max_date = pc.max(table.column("date")).as_py()
     assert max_date > "2024-01-01", f"Expected recent data, got latest: {max_date}"
 
 
-def parse_na_current(excel_path: Path) -> list[dict]:
+def parse_na_current(excel_path: Path) -> pa.Table | None:
     """Parse North America current rig count report."""
     try:
-        xl = pd.ExcelFile(excel_path, engine="openpyxl")
+        all_sheets = pd.read_excel(excel_path, sheet_name=None, header=None, engine="calamine")
     except Exception:
-        try:
-            xl = pd.ExcelFile(excel_path, engine="xlrd")
-        except Exception:
-            return []
-
-    records = []
+        return None
 
-    for sheet_name in xl.sheet_names:
-        df = pd.read_excel(xl, sheet_name=sheet_name, header=None)
+    frames = []
 
+    for sheet_name, df in all_sheets.items():
         if len(df) < 5 or len(df.columns) < 3:
             continue
 
+        # Scan the candidate rows from one contiguous numpy block rather than
+        # materializing a Series per df.iloc[i]
+        head = df.iloc[:min(10, len(df))].to_numpy()
         header_row = None
-        for i in range(min(10, len(df))):
-            row = df.iloc[i]
-            date_count = 0
-            for val in row:
-                if pd.notna(val):
-                    try:
-                        pd.to_datetime(val)
-                        date_count += 1
-                    except Exception:
-                        pass
+        for i in range(len(head)):
+            # Mask empty cells up front so the coercion only sees candidates
+            row_values = head[i][~pd.isna(head[i])]
+            if len(row_values) < 5:
+                continue
+            date_count = pd.to_datetime(pd.Series(row_values), errors="coerce").notna().sum()
             if date_count >= 5:
                 header_row = i
                 break
@@ -113,68 +133,50 @@ def parse_na_current(excel_path: Path) -> list[dict]:
         if header_row is None:
             continue
 
-        dates = []
-        for val in df.iloc[header_row]:
-            if pd.notna(val):
-                try:
-                    dates.append(pd.to_datetime(val))
-                except Exception:
-                    dates.append(None)
-            else:
-                dates.append(None)
-
-        for i in range(header_row + 1, len(df)):
-            row = df.iloc[i]
-            region = str(row.iloc[0]) if pd.notna(row.iloc[0]) else None
-
-            if region is None or region.strip() == "" or region == "nan":
-                continue
-
-            region = region.strip()
-            if region.upper() in ["TOTAL", "GRAND TOTAL", "US TOTAL"]:
-                region = "US Total"
+        dates = pd.to_datetime(df.iloc[header_row], errors="coerce")
+        date_mask = dates.notna()
 
-            for col_idx, date_val in enumerate(dates):
-                if date_val is None or col_idx >= len(row):
-                    continue
+        data = df.iloc[header_row + 1:]
+        keep = data.iloc[:, 0].notna() & (data.iloc[:, 0].astype(str).str.strip() != "")
+        data = data.loc[keep]
+        regions = data.iloc[:, 0].astype(str).str.strip()
+        regions = regions.mask(regions.str.upper().isin(["TOTAL", "GRAND TOTAL", "US TOTAL"]), "US Total")
 
-                count_val = row.iloc[col_idx]
-                if pd.isna(count_val):
-                    continue
+        block = data.loc[:, date_mask]
+        block.columns = dates[date_mask]
+        block.insert(0, "region", regions)
 
-                try:
-                    count = int(float(count_val))
-                except (ValueError, TypeError):
-                    continue
+        long = block.melt(id_vars="region", var_name="date", value_name="count")
+        long["date"] = pd.to_datetime(long["date"])
+        long["count"] = pd.to_numeric(long["count"], errors="coerce")
+        long = long.dropna(subset=["count"])
+        long["count"] = long["count"].astype(int)
+        long["rig_type"] = "Total"
 
-                records.append({
-                    "date": date_val.strftime("%Y-%m-%d"),
-                    "region": region,
-                    "rig_type": "Total",
-                    "count": count,
-                })
+        frames.append(long[["date", "region", "rig_type", "count"]])
 
-    return records
+    if not frames:
+        return None
+    return pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
 
 
-def parse_rigs_by_state(excel_path: Path) -> list[dict]:
+def parse_rigs_by_state(excel_path: Path) -> pa.Table | None:
     """Parse rigs by state Excel file."""
     try:
-        xl = pd.ExcelFile(excel_path, engine="openpyxl")
+        all_sheets = pd.read_excel(excel_path, sheet_name=None, header=None, engine="calamine")
     except Exception:
-        return []
+        return None
 
-    records = []
-
-    for sheet_name in xl.sheet_names:
-        df = pd.read_excel(xl, sheet_name=sheet_name, header=None)
+    frames = []
 
+    for sheet_name, df in all_sheets.items():
         if len(df) < 3:
             continue
 
         header_row = 0
         for i in range(min(5, len(df))):
-            if "State" in str(df.iloc[i, 0]) or "Location" in str(df.iloc[i, 0]):
+            value = df.iat[i, 0]
+            if isinstance(value, str) and ("State" in value or "Location" in value):
                 header_row = i
                 break
 
@@ -192,80 +194,94 @@ def parse_rigs_by_state(excel_path: Path) -> list[dict]:
 
         date_cols = [c for c in df.columns if c != state_col]
 
-        for _, row in df.iterrows():
-            state = row[state_col]
-            if pd.isna(state) or str(state).strip() == "":
-                continue
-
-            state = str(state).strip()
+        parsed_dates = pd.to_datetime(pd.Series(date_cols), errors="coerce")
+        valid_date_cols = [col for col, parsed in zip(date_cols, parsed_dates) if pd.notna(parsed)]
+        if not valid_date_cols:
+            continue
 
-            for col in date_cols:
-                try:
-                    date_val = pd.to_datetime(col)
-                except Exception:
-                    continue
+        keep = df[state_col].notna() & (df[state_col].astype(str).str.strip() != "")
+        states = df.loc[keep, state_col].astype(str).str.strip()
 
-                count_val = row[col]
-                if pd.isna(count_val):
-                    continue
+        block = df.loc[keep, valid_date_cols]
+        block.columns = parsed_dates.dropna()
+        block.insert(0, "region", states)
 
-                try:
-                    count = int(float(count_val))
-                except (ValueError, TypeError):
-                    continue
+        long = block.melt(id_vars="region", var_name="date", value_name="count")
+        long["date"] = pd.to_datetime(long["date"])
+        long["count"] = pd.to_numeric(long["count"], errors="coerce")
+        long = long.dropna(subset=["count"])
+        long["count"] = long["count"].astype(int)
+        long["rig_type"] = sheet_name if sheet_name in {"Oil", "Gas", "Misc"} else "Total"
 
-                records.append({
-                    "date": date_val.strftime("%Y-%m-%d"),
-                    "region": state,
-                    "rig_type": sheet_name if sheet_name in ["Oil", "Gas", "Misc"] else "Total",
-                    "count": count,
-                })
+        frames.append(long[["date", "region", "rig_type", "count"]])
 
-    return records
+    if not frames:
+        return None
+    return pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
 
 
 def run():
     """Ingest and transform Baker Hughes rig count data."""
     # Ingest
     print("Fetching Baker Hughes rig count files...")
-    for name, url in FILES.items():
-        print(f"  Fetching {name}...")
-        response = fetch_file(url, timeout=300)
-        save_raw_file(response.content, name, extension="xlsx")
-        print(f"    Saved {name}.xlsx ({len(response.content):,} bytes)")
+    http_cache = load_state("baker_hughes_http_cache")
+    with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+        futures = {executor.submit(fetch_file, url, name, 300, http_cache.get(name)): name
+                   for name, url in FILES.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            result = future.result()
+            if result is None:
+                print(f"  {name}.xlsx unchanged (304)")
+                continue
+            size, validators = result
+            http_cache[name] = validators
+            print(f"  Saved {name}.xlsx ({size:,} bytes)")
+    save_state("baker_hughes_http_cache", http_cache)
 
     # Transform
     print("Transforming rig count data...")
     data_dir = Path(get_data_dir())
-    all_records = []
+    tables = []
 
     na_current_path = data_dir / "raw" / "na_current.xlsx"
     if na_current_path.exists():
         print("  Parsing NA current report...")
-        records = parse_na_current(na_current_path)
-        print(f"    Found {len(records):,} records")
-        all_records.extend(records)
+        parsed = parse_na_current(na_current_path)
+        if parsed is not None:
+            print(f"    Found {len(parsed):,} records")
+            tables.append(parsed)
 
     rigs_by_state_path = data_dir / "raw" / "rigs_by_state.xlsx"
     if rigs_by_state_path.exists():
         print("  Parsing rigs by state...")
-        records = parse_rigs_by_state(rigs_by_state_path)
-        print(f"    Found {len(records):,} records")
-        all_records.extend(records)
+        parsed = parse_rigs_by_state(rigs_by_state_path)
+        if parsed is not None:
+            print(f"    Found {len(parsed):,} records")
+            tables.append(parsed)
 
-    if not all_records:
+    if not tables:
         raise ValueError("No records parsed from any input file")
 
-    # Deduplicate
-    seen = set()
-    deduped = []
-    for r in all_records:
-        key = (r["date"], r["region"], r["rig_type"])
-        if key not in seen:
-            seen.add(key)
-            deduped.append(r)
-
-    table = pa.Table.from_pylist(deduped)
+    # Deduplicate on (date, region, rig_type), keeping the first occurrence;
+    # single-threaded group_by scans in concat order so na_current wins ties
+    table = pa.concat_tables(tables)
+    table = table.group_by(["date", "region", "rig_type"], use_threads=False).aggregate([("count", "first")])
+    table = table.rename_columns([name.removesuffix("_first") for name in table.column_names])
+
+    # Weekly counts fit comfortably in 32 bits; halve the column width
+    count_position = table.schema.get_field_index("count")
+    table = table.set_column(count_position, "count", pc.cast(table["count"], pa.int32()))
+
+    # Dates stay as timestamps through parsing and dedup; format the whole
+    # column to YYYY-MM-DD strings in one pass here
+    date_position = table.schema.get_field_index("date")
+    table = table.set_column(date_position, "date", pc.strftime(table["date"], format="%Y-%m-%d"))
+
+    # region (<100 distinct values) and rig_type (4) compress well as dictionaries
+    for name in ("region", "rig_type"):
+        position = table.schema.get_field_index(name)
+        table = table.set_column(position, name, pc.dictionary_encode(table[name]))
     print(f"  Transformed {len(table):,} records (after dedup)")
 
     test(table)
@@ -3,9 +3,11 @@
 Data source: https://www.sca.isr.umich.edu/
 """
 
-import csv
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from subsets_utils import get, save_raw_json, load_raw_json, upload_data, validate
 from subsets_utils.testing import assert_valid_month
 
@@ -24,27 +26,40 @@ MONTH_MAP = {
     "September": 9, "October": 10, "November": 11, "December": 12
 }
 
+# Lookup arrays for the vectorized month-name mapping, built once at import
+MONTH_NAMES = pa.array(list(MONTH_MAP), pa.string())
+MONTH_NUMBERS = pa.array([f"{num:02d}" for num in MONTH_MAP.values()], pa.string())
 
-def parse_date(month_str, year_str):
-    """Convert month name and year to YYYY-MM."""
-    month = MONTH_MAP.get(month_str.strip())
-    year = int(year_str.strip())
-    if month:
-        return f"{year}-{month:02d}"
-    return None
 
+def _read_sentiment_csv(csv_text: str, value_columns: list[str]) -> pa.Table:
+    """Read a UMich CSV with string columns and drop rows before START_YEAR."""
+    table = pacsv.read_csv(
+        BytesIO(csv_text.encode("utf-8")),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in ["YYYY", "Month", *value_columns]},
+        ),
+    )
+    years = pc.cast(pc.utf8_trim_whitespace(table.column("YYYY")), pa.int32())
+    return table.filter(pc.greater_equal(years, START_YEAR))
 
-def parse_float(value):
-    """Parse a float value, returning None for empty/invalid."""
-    if value is None:
-        return None
-    value = value.strip()
-    if not value or value == ".":
-        return None
-    try:
-        return float(value)
-    except ValueError:
-        return None
+
+def _month_column(table: pa.Table) -> pa.ChunkedArray:
+    """Build YYYY-MM strings from Month name and YYYY columns; misses are null."""
+    trimmed = pc.utf8_trim_whitespace(table.column("Month"))
+    numbers = pc.take(MONTH_NUMBERS, pc.index_in(trimmed, value_set=MONTH_NAMES))
+    years = pc.utf8_trim_whitespace(table.column("YYYY"))
+    return pc.binary_join_element_wise(years, numbers, "-")
+
+
+def _float_column(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Cast a string column to float64, treating blanks and '.' as null."""
+    trimmed = pc.utf8_trim_whitespace(values)
+    cleaned = pc.if_else(
+        pc.is_in(trimmed, value_set=pa.array(["", "."], pa.string())),
+        pa.scalar(None, pa.string()),
+        trimmed,
+    )
+    return pc.cast(cleaned, pa.float64())
 
 
 def test_consumer_sentiment(table: pa.Table) -> None:
@@ -93,32 +108,18 @@ def test_inflation_expectations(table: pa.Table) -> None:
 
 def process_consumer_sentiment(csv_text):
     """Transform consumer sentiment data."""
-    reader = csv.DictReader(StringIO(csv_text))
-
-    processed = []
-    for row in reader:
-        year = int(row.get("YYYY", "0").strip())
-        if year < START_YEAR:
-            continue
-
-        month = parse_date(row.get("Month", ""), row.get("YYYY", ""))
-        if not month:
-            continue
+    raw = _read_sentiment_csv(csv_text, ["ICS_ALL"])
 
-        value = parse_float(row.get("ICS_ALL"))
-        if value is None:
-            continue
-
-        processed.append({
-            "month": month,
-            "index": value,
-        })
+    table = pa.table({
+        "month": _month_column(raw),
+        "index": _float_column(raw.column("ICS_ALL")),
+    })
+    table = table.filter(pc.and_(pc.is_valid(table["month"]), pc.is_valid(table["index"])))
 
-    if not processed:
+    if len(table) == 0:
         raise ValueError("No consumer sentiment data found")
 
-    print(f"  Transformed {len(processed):,} consumer sentiment observations")
-    table = pa.Table.from_pylist(processed)
+    print(f"  Transformed {len(table):,} consumer sentiment observations")
 
     test_consumer_sentiment(table)
     upload_data(table, "umich_consumer_sentiment", mode="overwrite")
@@ -126,35 +127,23 @@ def process_consumer_sentiment(csv_text):
 
 def process_sentiment_components(csv_text):
     """Transform sentiment components data."""
-    reader = csv.DictReader(StringIO(csv_text))
-
-    processed = []
-    for row in reader:
-        year = int(row.get("YYYY", "0").strip())
-        if year < START_YEAR:
-            continue
-
-        month = parse_date(row.get("Month", ""), row.get("YYYY", ""))
-        if not month:
-            continue
+    raw = _read_sentiment_csv(csv_text, ["ICC", "ICE"])
 
-        icc = parse_float(row.get("ICC"))
-        ice = parse_float(row.get("ICE"))
-
-        if icc is None and ice is None:
-            continue
-
-        processed.append({
-            "month": month,
-            "index_current_conditions": icc,
-            "index_expectations": ice,
-        })
+    table = pa.table({
+        "month": _month_column(raw),
+        "index_current_conditions": _float_column(raw.column("ICC")),
+        "index_expectations": _float_column(raw.column("ICE")),
+    })
+    table = table.filter(pc.and_(
+        pc.is_valid(table["month"]),
+        pc.or_(pc.is_valid(table["index_current_conditions"]),
+               pc.is_valid(table["index_expectations"])),
+    ))
 
-    if not processed:
+    if len(table) == 0:
         raise ValueError("No sentiment components data found")
 
-    print(f"  Transformed {len(processed):,} sentiment component observations")
-    table = pa.Table.from_pylist(processed)
+    print(f"  Transformed {len(table):,} sentiment component observations")
 
     test_sentiment_components(table)
     upload_data(table, "umich_sentiment_components", mode="overwrite")
@@ -162,35 +151,23 @@ def process_sentiment_components(csv_text):
 
 def process_inflation_expectations(csv_text):
     """Transform inflation expectations data."""
-    reader = csv.DictReader(StringIO(csv_text))
-
-    processed = []
-    for row in reader:
-        year = int(row.get("YYYY", "0").strip())
-        if year < START_YEAR:
-            continue
-
-        month = parse_date(row.get("Month", ""), row.get("YYYY", ""))
-        if not month:
-            continue
+    raw = _read_sentiment_csv(csv_text, ["PX_MD", "PX5_MD"])
 
-        px1 = parse_float(row.get("PX_MD"))
-        px5 = parse_float(row.get("PX5_MD"))
-
-        if px1 is None and px5 is None:
-            continue
-
-        processed.append({
-            "month": month,
-            "inflation_1yr": px1,
-            "inflation_5yr": px5,
-        })
+    table = pa.table({
+        "month": _month_column(raw),
+        "inflation_1yr": _float_column(raw.column("PX_MD")),
+        "inflation_5yr": _float_column(raw.column("PX5_MD")),
+    })
+    table = table.filter(pc.and_(
+        pc.is_valid(table["month"]),
+        pc.or_(pc.is_valid(table["inflation_1yr"]),
+               pc.is_valid(table["inflation_5yr"])),
+    ))
 
-    if not processed:
+    if len(table) == 0:
         raise ValueError("No inflation expectations data found")
 
-    print(f"  Transformed {len(processed):,} inflation expectation observations")
-    table = pa.Table.from_pylist(processed)
+    print(f"  Transformed {len(table):,} inflation expectation observations")
 
     test_inflation_expectations(table)
     upload_data(table, "umich_inflation_expectations", mode="overwrite")
@@ -198,26 +175,32 @@ def process_inflation_expectations(csv_text):
 
 def run():
     """Ingest and transform UMich Consumer Sentiment data."""
-    # Ingest
+    # Ingest - the three fetches are independent, so overlap the round-trips
     print("Fetching UMich Consumer Sentiment data...")
-    all_data = {}
-
-    for filename, key in FILES:
-        print(f"  Fetching {filename}...")
-        url = f"{BASE_URL}/{filename}"
-        response = get(url)
-        response.raise_for_status()
-        all_data[key] = response.text
+    with ThreadPoolExecutor(max_workers=len(FILES)) as executor:
+        futures = {key: executor.submit(get, f"{BASE_URL}/{filename}")
+                   for filename, key in FILES}
+        all_data = {}
+        for key, future in futures.items():
+            response = future.result()
+            response.raise_for_status()
+            all_data[key] = response.text
 
     save_raw_json(all_data, "sentiment_data")
 
-    # Transform
+    # Transform - each file feeds its own dataset, and Arrow parsing and the
+    # Delta writes release the GIL, so the three pipelines run in parallel
     print("Transforming sentiment data...")
     raw_data = load_raw_json("sentiment_data")
 
-    process_consumer_sentiment(raw_data["consumer_sentiment"])
-    process_sentiment_components(raw_data["sentiment_components"])
-    process_inflation_expectations(raw_data["inflation_expectations"])
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(process_consumer_sentiment, raw_data["consumer_sentiment"]),
+            executor.submit(process_sentiment_components, raw_data["sentiment_components"]),
+            executor.submit(process_inflation_expectations, raw_data["inflation_expectations"]),
+        ]
+        for future in futures:
+            future.result()
 
 
 NODES = {
@@ -4,6 +4,8 @@ Data source: https://datahub.io/core/s-and-p-500
 """
 
 import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from subsets_utils import get, save_raw_file, load_raw_file, upload_data, validate
 
 DATA_URL = "https://datahub.io/core/s-and-p-500/r/data.csv"
@@ -37,12 +39,12 @@ def test(table: pa.Table) -> None:
         "min_rows": 1000,
     })
 
-    dates = table.column("date").to_pylist()
-    assert dates[0] < dates[-1], "Data should be chronologically sorted"
+    assert table["date"][0].as_py() < table["date"][-1].as_py(), \
+        "Data should be chronologically sorted"
 
-    cape_values = [c for c in table.column("cape").to_pylist() if c]
-    assert min(cape_values) > 0, "CAPE should be positive"
-    assert max(cape_values) < 100, "CAPE should be reasonable"
+    cape_range = pc.min_max(table.column("cape"))
+    assert cape_range["min"].as_py() > 0, "CAPE should be positive"
+    assert cape_range["max"].as_py() < 100, "CAPE should be reasonable"
 
     print(f"  Validated {len(table):,} Shiller records")
 
@@ -53,43 +55,41 @@ def run():
     print("Fetching Shiller S&P 500 data...")
     response = get(DATA_URL)
     response.raise_for_status()
-    save_raw_file(response.text, "shiller_data", extension="csv")
+    save_raw_file(response.content, "shiller_data", extension="csv")
 
     # Transform
     print("Transforming Shiller data...")
-    csv_text = load_raw_file("shiller_data", extension="csv")
-
-    lines = csv_text.strip().split('\n')
-    header = lines[0].split(',')
-
-    rows_by_date = {}
-    for line in lines[1:]:
-        values = line.split(',')
-        if len(values) != len(header):
-            continue
-
-        row = {}
-        for i, col in enumerate(header):
-            val = values[i].strip()
-            mapped_col = COLUMN_MAP.get(col, col.lower().replace(' ', '_'))
-            if val == '' or val == 'NA':
-                row[mapped_col] = None
-            else:
-                try:
-                    row[mapped_col] = float(val)
-                except ValueError:
-                    row[mapped_col] = val
-        rows_by_date[row['date']] = row
-
-    if not rows_by_date:
+    csv_data = load_raw_file("shiller_data", extension="csv", binary=True)
+
+    table = pacsv.read_csv(
+        pa.BufferReader(csv_data),
+        convert_options=pacsv.ConvertOptions(
+            column_types={"Date": pa.string()},
+            null_values=["", "NA"],
+            strings_can_be_null=True,
+        ),
+    )
+    table = table.rename_columns(
+        [COLUMN_MAP.get(col, col.lower().replace(' ', '_')) for col in table.column_names]
+    )
+
+    if len(table) == 0:
         raise ValueError("No Shiller data found")
 
-    rows = [rows_by_date[d] for d in sorted(rows_by_date.keys())]
+    # Deduplicate by date, keeping the last occurrence; single-threaded
+    # group_by preserves file order so "last" matches the old dict overwrite.
+    # skip_nulls=False so a null cell in a later row overwrites too, instead
+    # of letting a stale earlier value survive
+    value_columns = [col for col in table.column_names if col != "date"]
+    table = table.group_by("date", use_threads=False).aggregate(
+        [(col, "last", pc.ScalarAggregateOptions(skip_nulls=False)) for col in value_columns]
+    )
+    table = table.rename_columns([name.removesuffix("_last") for name in table.column_names])
+    table = table.select(["date", *value_columns]).sort_by("date")
 
-    print(f"  Transformed {len(rows):,} rows")
-    print(f"  Date range: {rows[0]['date']} to {rows[-1]['date']}")
+    print(f"  Transformed {len(table):,} rows")
+    print(f"  Date range: {table['date'][0].as_py()} to {table['date'][-1].as_py()}")
 
-    table = pa.Table.from_pylist(rows)
     test(table)
     upload_data(table, DATASET_ID, mode="overwrite")
 
@@ -1,5 +1,5 @@
-from .http_client import get, post, put, delete, get_client, configure_http
-from .io import upload_data, load_state, save_state, load_asset, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet, list_raw_files, data_hash
+from .http_client import get, post, put, delete, get_client, configure_http, create_async_client, logged_async_request
+from .io import upload_data, load_state, save_state, load_asset, save_raw_json, load_raw_json, save_raw_file, save_raw_file_stream, load_raw_file, save_raw_parquet, load_raw_parquet, list_raw_files, data_hash
 from .orchestrator import DAG, load_nodes
 from . import duckdb
 from .config import validate_environment, get_data_dir, is_cloud
@@ -9,8 +9,9 @@ from . import debug
 
 __all__ = [
     'get', 'post', 'put', 'delete', 'get_client', 'configure_http',
+    'create_async_client', 'logged_async_request',
     'upload_data', 'load_state', 'save_state', 'load_asset', 'data_hash',
-    'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
+    'save_raw_json', 'load_raw_json', 'save_raw_file', 'save_raw_file_stream', 'load_raw_file',
     'save_raw_parquet', 'load_raw_parquet', 'list_raw_files',
     'validate_environment', 'get_data_dir', 'is_cloud',
     'publish',
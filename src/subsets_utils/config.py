@@ -5,17 +5,23 @@ Both local and cloud (R2) execution modes are handled here.
 """
 
 import os
+from functools import lru_cache
 
 
 # =============================================================================
 # Environment Detection
 # =============================================================================
 
+# The environment is fixed per process, so mode/name/credential getters are
+# cached - they sit on the hot path of every raw asset and state operation.
+
+@lru_cache(maxsize=1)
 def is_cloud() -> bool:
     """Check if running in cloud mode (CI environment)."""
     return os.environ.get('CI', '').lower() == 'true'
 
 
+@lru_cache(maxsize=1)
 def get_connector_name() -> str:
     """Get current connector name."""
     return os.environ.get('CONNECTOR_NAME', 'unknown')
@@ -77,6 +83,7 @@ def validate_environment(additional_required: list[str] = None):
 # R2/S3 Storage Options
 # =============================================================================
 
+@lru_cache(maxsize=1)
 def get_storage_options() -> dict | None:
     """Get storage options for DeltaLake S3 writes. Returns None for local mode."""
     if not is_cloud():
@@ -90,6 +97,7 @@ def get_storage_options() -> dict | None:
     }
 
 
+@lru_cache(maxsize=1)
 def get_bucket_name() -> str:
     """Get R2 bucket name."""
     return os.environ['R2_BUCKET_NAME']
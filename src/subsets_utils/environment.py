@@ -1,38 +0,0 @@
-import os
-
-from .storage import is_cloud
-
-
-def validate_environment(additional_required: list[str] = None):
-    """Validate required environment variables based on execution mode.
-
-    Local mode: requires DATA_DIR
-    Cloud mode: requires R2 credentials
-
-    Args:
-        additional_required: Optional list of additional env vars to require (e.g., API keys)
-    """
-    if is_cloud():
-        required = ["R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME"]
-    else:
-        required = ["DATA_DIR"]
-
-    if additional_required:
-        required.extend(additional_required)
-
-    missing = [var for var in required if var not in os.environ]
-    if missing:
-        mode = "cloud" if is_cloud() else "local"
-        raise ValueError(f"Missing required environment variables for {mode} mode: {missing}")
-
-
-def get_data_dir():
-    """Get data directory. Only valid in local mode."""
-    if is_cloud():
-        # In cloud mode, return a temp directory (data goes to R2, not disk)
-        return "/tmp/data"
-    return os.environ['DATA_DIR']
-
-
-def get_run_id():
-    return os.environ.get('RUN_ID', 'unknown')
\ No newline at end of file
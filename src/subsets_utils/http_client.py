@@ -6,7 +6,11 @@ from . import debug
 _client = None
 _client_config = {
     'timeout': int(os.environ.get('HTTP_TIMEOUT', '30')),
-    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')}
+    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')},
+    # HTTP/2 multiplexes requests to the same host over one connection,
+    # amortizing TCP+TLS setup across many small fetches
+    'http2': True,
+    'limits': httpx.Limits(max_connections=20, max_keepalive_connections=20),
 }
 
 
@@ -17,6 +21,8 @@ def _get_or_create_client() -> httpx.Client:
         _client = httpx.Client(
             timeout=_client_config['timeout'],
             headers=_client_config['headers'],
+            http2=_client_config['http2'],
+            limits=_client_config['limits'],
             follow_redirects=True
         )
 
@@ -62,6 +68,41 @@ def get_client() -> httpx.Client:
     return _get_or_create_client()
 
 
+def create_async_client(timeout: int | None = None,
+                        limits: httpx.Limits | None = None) -> httpx.AsyncClient:
+    """Build an AsyncClient with the shared headers and HTTP/2 settings.
+
+    Async clients are scoped to a single event loop, so callers own the
+    lifecycle (use ``async with``) rather than sharing a module singleton.
+    """
+    return httpx.AsyncClient(
+        timeout=timeout if timeout is not None else _client_config['timeout'],
+        headers=_client_config['headers'],
+        http2=_client_config['http2'],
+        limits=limits if limits is not None else _client_config['limits'],
+        follow_redirects=True
+    )
+
+
+async def logged_async_request(client: httpx.AsyncClient, method: str, url: str,
+                               **kwargs) -> httpx.Response:
+    """Execute an async HTTP request with the same logging as the sync helpers."""
+    start = time.time()
+    error = None
+    status = None
+
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        duration_ms = int((time.time() - start) * 1000)
+        debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
+
+
 def configure_http(**config):
     global _client_config, _client
     _client_config.update(config)
@@ -4,6 +4,8 @@ import os
 import io
 import json
 import gzip
+import zstandard
+import xxhash
 import uuid
 import hashlib
 import shutil
@@ -83,10 +85,31 @@ def _cache_lookup(key: str) -> Optional[Path]:
 
 def _compute_table_hash(table: pa.Table) -> str:
     """Compute a stable hash of a PyArrow table for change detection."""
-    # Write to parquet bytes for consistent hashing
-    buffer = io.BytesIO()
-    pq.write_table(table, buffer, compression='snappy')
-    return hashlib.sha256(buffer.getvalue()).hexdigest()[:16]
+    # Hash the Arrow buffers directly rather than round-tripping through a
+    # Parquet encode + compress. combine_chunks normalizes chunk layout so
+    # identical data always hashes identically. xxh3 is a non-cryptographic
+    # fingerprint - plenty for change detection.
+    h = xxhash.xxh3_128()
+    h.update(str(table.schema).encode())
+    h.update(len(table).to_bytes(8, 'little'))
+
+    def hash_array(array: pa.Array) -> None:
+        # A zero-copy slice shares its parent's buffers, so mix in the
+        # logical window to keep it from hashing like the full array
+        h.update(array.offset.to_bytes(8, 'little'))
+        h.update(len(array).to_bytes(8, 'little'))
+        for buf in array.buffers():
+            if buf is not None:
+                h.update(memoryview(buf))
+        # buffers() on a DictionaryArray covers only the indices; the
+        # dictionary values live in a separate array and must be hashed too
+        if isinstance(array, pa.DictionaryArray):
+            hash_array(array.dictionary)
+
+    for column in table.combine_chunks().columns:
+        for chunk in column.chunks:
+            hash_array(chunk)
+    return h.hexdigest()[:16]
 
 
 def data_hash(table: pa.Table) -> str:
@@ -101,6 +124,17 @@ def _get_hash_state_key(dataset_name: str) -> str:
     return f"_hash_{dataset_name}"
 
 
+# Heavily chunked tables slow every downstream pass (hashing, Delta row-group
+# building) linearly in chunk count; flatten once past this threshold
+MIN_NUM_CHUNKS_TO_TRIGGER_COMBINE = 4
+
+
+def _maybe_combine_chunks(data: pa.Table) -> pa.Table:
+    if any(col.num_chunks > MIN_NUM_CHUNKS_TO_TRIGGER_COMBINE for col in data.columns):
+        return data.combine_chunks()
+    return data
+
+
 def sync_data(data: pa.Table, dataset_name: str, mode: str = "overwrite") -> str | None:
     """Sync a PyArrow table to a Delta table, only if data has changed.
 
@@ -112,6 +146,8 @@ def sync_data(data: pa.Table, dataset_name: str, mode: str = "overwrite") -> str
         print(f"No data to sync for {dataset_name}")
         return None
 
+    data = _maybe_combine_chunks(data)
+
     # Compute hash of new data
     new_hash = _compute_table_hash(data)
 
@@ -146,7 +182,9 @@ def sync_data(data: pa.Table, dataset_name: str, mode: str = "overwrite") -> str
     save_state(_get_hash_state_key(dataset_name), {"hash": new_hash})
 
     # Log output
-    null_counts = {col: data[col].null_count for col in data.column_names if data[col].null_count > 0}
+    # null_count may trigger a scan on chunked columns, so touch it once per column
+    all_null_counts = {col: data[col].null_count for col in data.column_names}
+    null_counts = {col: count for col, count in all_null_counts.items() if count > 0}
     debug.log_data_output(dataset_name=dataset_name, row_count=len(data), size_bytes=data.nbytes,
                           columns=data.column_names, column_count=len(data.schema), null_counts=null_counts, mode=mode)
 
@@ -172,6 +210,8 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         print(f"No data to upload for {dataset_name}")
         return ""
 
+    data = _maybe_combine_chunks(data)
+
     size_mb = round(data.nbytes / 1024 / 1024, 2)
     columns = ', '.join([f.name for f in data.schema])
     mode_label = {"append": "Appending to", "overwrite": "Overwriting", "merge": "Merging into"}[mode]
@@ -206,7 +246,9 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
                         schema_mode="merge" if mode == "append" else "overwrite")
 
     # Log output
-    null_counts = {col: data[col].null_count for col in data.column_names if data[col].null_count > 0}
+    # null_count may trigger a scan on chunked columns, so touch it once per column
+    all_null_counts = {col: data[col].null_count for col in data.column_names}
+    null_counts = {col: count for col, count in all_null_counts.items() if count > 0}
     debug.log_data_output(dataset_name=dataset_name, row_count=len(data), size_bytes=data.nbytes,
                           columns=data.column_names, column_count=len(data.schema), null_counts=null_counts, mode=mode)
 
@@ -243,7 +285,7 @@ def has_changed(new_data: pa.Table, asset_name: str) -> bool:
         existing = load_asset(asset_name)
         if len(new_data) != len(existing) or new_data.schema != existing.schema:
             return True
-        return new_data.to_pandas().to_csv(index=False) != existing.to_pandas().to_csv(index=False)
+        return not new_data.equals(existing)
     except Exception:
         return True
 
@@ -264,22 +306,40 @@ def load_state(asset: str) -> dict:
         return json.load(open(state_file)) if state_file.exists() else {}
 
 
+# Last-written state digest per asset, so no-op saves skip the write entirely
+_state_hash_cache: dict[str, bytes] = {}
+
+
 def save_state(asset: str, state_data: dict) -> str:
-    """Save state for an asset."""
-    old_state = load_state(asset)
-    state_data = {**state_data, '_metadata': {'updated_at': datetime.now().isoformat(), 'run_id': os.environ.get('RUN_ID', 'unknown')}}
+    """Save state for an asset. No-op when the payload hasn't changed this run."""
+    # Digest excludes _metadata, whose timestamp changes on every call
+    digest = hashlib.blake2b(
+        json.dumps(state_data, sort_keys=True).encode('utf-8'), digest_size=8
+    ).digest()
 
     if _is_cloud_mode():
-        uri = upload_bytes(json.dumps(state_data, indent=2).encode('utf-8'), _state_key(asset))
-        debug.log_state_change(asset, old_state, state_data)
-        return uri
+        destination = _state_key(asset)
     else:
         state_dir = Path(get_data_dir()) / "state"
         state_dir.mkdir(parents=True, exist_ok=True)
-        state_file = state_dir / f"{asset}.json"
-        json.dump(state_data, open(state_file, 'w'), indent=2)
-        debug.log_state_change(asset, old_state, state_data)
-        return str(state_file)
+        destination = str(state_dir / f"{asset}.json")
+
+    if _state_hash_cache.get(asset) == digest:
+        return destination
+
+    # The old state is only needed for the debug log; skip the extra
+    # read (an R2 GET in cloud mode) when logging is off
+    old_state = load_state(asset) if debug._is_logging_enabled() else {}
+    state_data = {**state_data, '_metadata': {'updated_at': datetime.now().isoformat(), 'run_id': os.environ.get('RUN_ID', 'unknown')}}
+
+    if _is_cloud_mode():
+        destination = upload_bytes(json.dumps(state_data, separators=(',', ':')).encode('utf-8'), _state_key(asset))
+    else:
+        json.dump(state_data, open(destination, 'w'), separators=(',', ':'))
+
+    _state_hash_cache[asset] = digest
+    debug.log_state_change(asset, old_state, state_data)
+    return destination
 
 
 # --- Raw data operations ---
@@ -294,18 +354,33 @@ def _raw_key(asset_id: str, ext: str) -> str:
     return f"{get_connector_name()}/data/raw/{asset_id}.{ext}"
 
 
-def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt") -> str:
-    """Save raw file (CSV, XML, ZIP, etc.)."""
+def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt", compress: bool = False) -> str:
+    """Save raw file (CSV, XML, ZIP, etc.).
+
+    With compress=True the payload is zstd-compressed and stored as
+    {asset_id}.{extension}.zst. Skip it for formats that are already
+    compressed (xlsx, zip). load_raw_file finds either form.
+    """
     from .tracking import record_write
 
+    if compress:
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        content = zstandard.ZstdCompressor(level=3).compress(data)
+        stale_extension = extension
+        extension = f"{extension}.zst"
+    else:
+        stale_extension = f"{extension}.zst"
+
     if _is_cloud_mode():
         data = content.encode('utf-8') if isinstance(content, str) else content
         key = _raw_key(asset_id, extension)
 
-        # Evict if needed and write to cache
+        # Evict if needed and write to cache; drop the other variant so a
+        # stale cached copy can't shadow this write on the next load
         _evict_if_needed(len(data))
         cache_path = _get_cache_path(key)
         cache_path.write_bytes(data)
+        _get_cache_path(_raw_key(asset_id, stale_extension)).unlink(missing_ok=True)
 
         # Upload to R2
         uri = upload_bytes(data, key)
@@ -318,52 +393,117 @@ def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt") -
             path.write_text(content, encoding='utf-8')
         else:
             path.write_bytes(content)
+        # Remove the other variant so this write is the one load_raw_file finds
+        _raw_path(asset_id, stale_extension).unlink(missing_ok=True)
         print(f"  -> Raw Cache: Saved {asset_id}.{extension}")
         record_write(f"raw/{asset_id}.{extension}")
         return str(path)
 
 
-def load_raw_file(asset_id: str, extension: str = "txt") -> str | bytes:
-    """Load raw file."""
-    from .tracking import record_read
+def _stream_to_path(chunks, path: Path) -> None:
+    """Stream chunks to path via a temp file, renaming only on success.
+
+    An interrupted download must never replace a previously good file with
+    a truncated one - especially since conditional GETs would then 304 and
+    keep the corrupt copy until upstream publishes new content.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
+def save_raw_file_stream(chunks, asset_id: str, extension: str = "txt") -> str:
+    """Save raw file from an iterator of byte chunks without buffering the full payload."""
+    from .tracking import record_write
 
     if _is_cloud_mode():
         key = _raw_key(asset_id, extension)
 
-        # Check cache first
-        cached = _cache_lookup(key)
-        if cached:
-            print(f"  <- Cache hit: {asset_id}.{extension}")
-            record_read(f"raw/{asset_id}.{extension}")
-            try:
-                return cached.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                return cached.read_bytes()
+        # Evict if needed and stream to cache, then upload the staged file
+        _evict_if_needed()
+        cache_path = _get_cache_path(key)
+        _stream_to_path(chunks, cache_path)
 
-        # Download from R2
-        data = download_bytes(key)
-        if data is None:
-            raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found in R2.")
+        uri = upload_file(str(cache_path), key)
+        print(f"  -> R2: Saved {asset_id}.{extension}")
+        record_write(f"raw/{asset_id}.{extension}")
+        return uri
+    else:
+        path = _raw_path(asset_id, extension)
+        _stream_to_path(chunks, path)
+        print(f"  -> Raw Cache: Saved {asset_id}.{extension}")
+        record_write(f"raw/{asset_id}.{extension}")
+        return str(path)
 
-        # Save to cache for next time
-        _evict_if_needed(len(data))
-        cache_path = _get_cache_path(key)
-        cache_path.write_bytes(data)
 
-        record_read(f"raw/{asset_id}.{extension}")
-        try:
-            return data.decode('utf-8')
-        except UnicodeDecodeError:
-            return data
+def _decode_raw(data: bytes) -> str | bytes:
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data
+
+
+def load_raw_file(asset_id: str, extension: str = "txt", binary: bool = False) -> str | bytes:
+    """Load raw file. Auto-detects zstd compression.
+
+    With binary=True the raw bytes are returned without a UTF-8 decode
+    attempt - useful when the consumer parses bytes directly (e.g. Arrow).
+    """
+    from .tracking import record_read
+
+    def decode(data: bytes) -> str | bytes:
+        return data if binary else _decode_raw(data)
+
+    # The compressed variant wins: it is what compress=True writers produce
+    # now, and an uncompressed file from before the format change may linger
+    # (R2 objects are never deleted)
+    if _is_cloud_mode():
+        # Check cache first (both compressed and plain)
+        for ext in (f"{extension}.zst", extension):
+            key = _raw_key(asset_id, ext)
+            cached = _cache_lookup(key)
+            if cached:
+                print(f"  <- Cache hit: {asset_id}.{ext}")
+                record_read(f"raw/{asset_id}.{ext}")
+                data = cached.read_bytes()
+                if ext.endswith(".zst"):
+                    data = zstandard.ZstdDecompressor().decompress(data)
+                return decode(data)
+
+        # Download from R2 (compressed first, then plain)
+        for ext in (f"{extension}.zst", extension):
+            key = _raw_key(asset_id, ext)
+            data = download_bytes(key)
+            if data is None:
+                continue
+
+            # Save to cache for next time
+            _evict_if_needed(len(data))
+            cache_path = _get_cache_path(key)
+            cache_path.write_bytes(data)
+
+            record_read(f"raw/{asset_id}.{ext}")
+            if ext.endswith(".zst"):
+                data = zstandard.ZstdDecompressor().decompress(data)
+            return decode(data)
+
+        raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found in R2.")
     else:
+        path = _raw_path(asset_id, f"{extension}.zst")
+        if path.exists():
+            record_read(f"raw/{asset_id}.{extension}.zst")
+            return decode(zstandard.ZstdDecompressor().decompress(path.read_bytes()))
         path = _raw_path(asset_id, extension)
-        if not path.exists():
-            raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found.")
-        record_read(f"raw/{asset_id}.{extension}")
-        try:
-            return path.read_text(encoding='utf-8')
-        except UnicodeDecodeError:
-            return path.read_bytes()
+        if path.exists():
+            record_read(f"raw/{asset_id}.{extension}")
+            return decode(path.read_bytes())
+        raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found.")
 
 
 def save_raw_json(data: any, asset_id: str, compress: bool = False) -> str:
@@ -374,10 +514,10 @@ def save_raw_json(data: any, asset_id: str, compress: bool = False) -> str:
     if compress:
         buffer = io.BytesIO()
         with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
-            gz.write(json.dumps(data).encode('utf-8'))
+            gz.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
         content = buffer.getvalue()
     else:
-        content = json.dumps(data, indent=2).encode('utf-8')
+        content = json.dumps(data, separators=(',', ':')).encode('utf-8')
 
     if _is_cloud_mode():
         key = _raw_key(asset_id, ext)
@@ -507,7 +647,7 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
 
         # Estimate size and evict if needed
         buffer = io.BytesIO()
-        pq.write_table(data, buffer, compression='snappy')
+        pq.write_table(data, buffer, compression='zstd', compression_level=3)
         _evict_if_needed(buffer.tell())
 
         # Write to cache
@@ -530,13 +670,13 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
         return uri
     else:
         path = _raw_path(asset_id, "parquet")
-        pq.write_table(data, path, compression='snappy')
+        pq.write_table(data, path, compression='zstd', compression_level=3)
         print(f"  -> Raw Cache: Saved {asset_id}.parquet ({data.num_rows:,} rows)")
         return str(path)
 
 
-def load_raw_parquet(asset_id: str) -> pa.Table:
-    """Load raw Parquet file as PyArrow table."""
+def load_raw_parquet(asset_id: str, columns: list[str] = None) -> pa.Table:
+    """Load raw Parquet file as PyArrow table, optionally projecting columns."""
     from .tracking import record_read
 
     if _is_cloud_mode():
@@ -547,7 +687,7 @@ def load_raw_parquet(asset_id: str) -> pa.Table:
         if cached:
             print(f"  <- Cache hit: {asset_id}.parquet")
             record_read(f"raw/{asset_id}.parquet")
-            return pq.read_table(cached)
+            return pq.read_table(cached, columns=columns)
 
         # Download from R2
         data = download_bytes(key)
@@ -560,13 +700,14 @@ def load_raw_parquet(asset_id: str) -> pa.Table:
         cache_path.write_bytes(data)
 
         record_read(f"raw/{asset_id}.parquet")
-        return pq.read_table(io.BytesIO(data))
+        # BufferReader wraps the downloaded bytes zero-copy (no BytesIO copy)
+        return pq.read_table(pa.BufferReader(pa.py_buffer(data)), columns=columns)
     else:
         path = _raw_path(asset_id, "parquet")
         if not path.exists():
             raise FileNotFoundError(f"Raw parquet asset '{asset_id}' not found at {path}")
         record_read(f"raw/{asset_id}.parquet")
-        return pq.read_table(path)
+        return pq.read_table(path, columns=columns)
 
 
 def get_raw_path(asset_id: str, ext: str = "parquet") -> str: